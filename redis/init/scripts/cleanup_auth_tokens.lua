@@ -0,0 +1,72 @@
+-- Clean up expired OAuth2 auth entries (DB 0)
+-- Members of the cleanup sorted set are full key names (e.g. auth:session:{id})
+-- scored by their expiry time in unix seconds. The whole sweep runs
+-- server-side in a single call instead of one round trip per entry. Only
+-- members matching one of the auth key prefixes below are deleted; other
+-- expired members are just removed from the set.
+--
+-- Runs as a plain script:
+--   redis-cli -n 0 --eval cleanup_auth_tokens.lua auth_token_cleanup auth_stats , [now]
+-- or, once loaded as the auth_cleanup library (FUNCTION LOAD with a
+-- "#!lua name=auth_cleanup" first line, as init-lua-scripts.sh does), as:
+--   redis-cli -n 0 FCALL auth_cleanup_expired 2 auth_token_cleanup auth_stats [now]
+
+-- Statistics field incremented for each expired key prefix
+local expired_fields = {
+    ["auth:code:"] = "expired_authorization_codes",
+    ["auth:access_token:"] = "expired_access_tokens",
+    ["auth:refresh_token:"] = "expired_refresh_tokens",
+    ["auth:session:"] = "expired_sessions"
+}
+
+-- Entries drained per pass; bounds the argument count of UNLINK/ZREM
+local batch_size = 500
+
+local function cleanup_expired(keys, args)
+    local cleanup_key = keys[1]
+    local stats_key = keys[2]
+    local now = tonumber(args[1]) or tonumber(redis.call("TIME")[1])
+
+    local cleaned = 0
+    local counts = {}
+
+    while true do
+        local expired = redis.call("ZRANGEBYSCORE", cleanup_key, "-inf", now, "LIMIT", 0, batch_size)
+        if #expired == 0 then
+            break
+        end
+
+        -- Only members naming a known auth key are deleted; anything else
+        -- (e.g. a stray auth_config member) is just dropped from the set
+        local doomed = {}
+        for _, key in ipairs(expired) do
+            for prefix, field in pairs(expired_fields) do
+                if string.sub(key, 1, #prefix) == prefix then
+                    doomed[#doomed + 1] = key
+                    counts[field] = (counts[field] or 0) + 1
+                    break
+                end
+            end
+        end
+
+        if #doomed > 0 then
+            redis.call("UNLINK", unpack(doomed))
+        end
+        redis.call("ZREM", cleanup_key, unpack(expired))
+        cleaned = cleaned + #doomed
+    end
+
+    for field, count in pairs(counts) do
+        redis.call("HINCRBY", stats_key, field, count)
+    end
+    redis.call("HSET", stats_key, "last_cleanup", now)
+
+    return cleaned
+end
+
+-- redis.register_function only exists while a library is being loaded
+if redis.register_function then
+    redis.register_function("auth_cleanup_expired", cleanup_expired)
+else
+    return cleanup_expired(KEYS, ARGV)
+end
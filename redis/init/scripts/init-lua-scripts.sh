@@ -48,6 +48,12 @@ declare -A SERVICE_NAMES=(
   [6]="Meal Plan Management"
 )
 
+# Function libraries (file -> library name) loaded once server-side and
+# invoked with FCALL; the files carry no shebang so they also run via --eval
+declare -A FUNCTION_LIBRARIES=(
+  ["cleanup_auth_tokens.lua"]="auth_cleanup"
+)
+
 echo ""
 echo "Initializing service databases..."
 echo "----------------------------------------------"
@@ -85,6 +91,34 @@ for script in $(echo "${!INIT_SCRIPTS[@]}" | tr ' ' '\n' | sort); do
   fi
 done
 
+echo ""
+echo "Loading function libraries..."
+
+for library in "${!FUNCTION_LIBRARIES[@]}"; do
+  library_path="${SCRIPT_DIR}/${library}"
+
+  if [[ -f "$library_path" ]]; then
+    library_name="${FUNCTION_LIBRARIES[$library]}"
+    echo "  Library: $library ($library_name)"
+
+    library_code="$(printf '#!lua name=%s\n' "$library_name"; cat "$library_path")"
+
+    # redis-cli can exit 0 after an error reply, so success also requires
+    # FUNCTION LOAD to answer with the library name
+    # shellcheck disable=SC2086
+    result=$(redis-cli -h "$REDIS_HOST" -p "$REDIS_PORT" $AUTH_ARGS \
+      FUNCTION LOAD REPLACE "$library_code" 2>&1) || true
+    if [[ "${result##*$'\n'}" == "$library_name" ]]; then
+      echo "  Status: SUCCESS"
+    else
+      echo "  Status: FAILED"
+      echo "  Error: $result"
+      exit 1
+    fi
+  else
+    echo "WARNING: Library not found: $library_path"
+  fi
+done
 echo ""
 echo "----------------------------------------------"
 echo "All service databases initialized successfully!"
@@ -26,7 +26,40 @@ show_usage() {
   list_services
 }
 
+# Keys dumped per EVAL call
+BACKUP_BATCH_SIZE=500
+
+# Server-side dump of type, TTL and value for a batch of keys. Returns the
+# comma-joined "key":{...} JSON members so each batch costs one round trip
+# instead of three per key.
+BACKUP_SCRIPT='
+local out = {}
+for i, key in ipairs(KEYS) do
+  local key_type = redis.call("TYPE", key)["ok"]
+  local value = cjson.null
+  if key_type == "string" then
+    value = redis.call("GET", key)
+  elseif key_type == "hash" then
+    local flat = redis.call("HGETALL", key)
+    value = {}
+    for j = 1, #flat, 2 do value[flat[j]] = flat[j + 1] end
+  elseif key_type == "list" then
+    value = redis.call("LRANGE", key, 0, -1)
+  elseif key_type == "set" then
+    value = redis.call("SMEMBERS", key)
+  elseif key_type == "zset" then
+    local flat = redis.call("ZRANGE", key, 0, -1, "WITHSCORES")
+    value = {}
+    for j = 1, #flat, 2 do value[#value + 1] = {member = flat[j], score = flat[j + 1]} end
+  end
+  out[i] = cjson.encode(key) .. ":" .. cjson.encode({type = key_type, ttl = redis.call("TTL", key), value = value})
+end
+return table.concat(out, ",")
+'
+
 # Backup a single service to JSON
+# Output is streamed batch by batch rather than accumulated in a variable, so
+# memory stays bounded by one batch regardless of database size.
 backup_service() {
   local service="$1"
   local db="${SERVICE_DB_MAP[$service]}"
@@ -34,71 +67,43 @@ backup_service() {
 
   print_info "Backing up $service (DB $db)..."
 
-  local keys
-  keys=$(get_db_keys "$db" 2>/dev/null || echo "")
+  local -a keys=()
+  mapfile -t keys < <(get_db_keys "$db" 2>/dev/null | grep -v '^$' || true)
 
-  local key_count=0
-  local backup_data="{"
-  backup_data+="\"service\":\"$service\","
-  backup_data+="\"database\":$db,"
-  backup_data+="\"description\":\"$desc\","
-  backup_data+="\"timestamp\":\"$TIMESTAMP\","
-  backup_data+="\"keys\":{"
+  printf '{"service":"%s","database":%s,"description":"%s","timestamp":"%s","keys":{' \
+    "$service" "$db" "$desc" "$TIMESTAMP"
 
   local first=true
+  local offset
+  local chunk
+  local chunk_count
+  local key_count=0
 
-  while IFS= read -r key; do
-    [[ -z "$key" ]] && continue
-    ((key_count++)) || true
-
-    local key_type
-    local ttl
-    local value=""
-
-    key_type=$(get_key_type "$db" "$key" 2>/dev/null || echo "unknown")
-    ttl=$(get_key_ttl "$db" "$key" 2>/dev/null || echo "-1")
-
-    # Get value based on type
-    case "$key_type" in
-      string)
-        value=$(redis_exec_raw "$db" GET "$key" 2>/dev/null | jq -Rs . || echo "null")
-        ;;
-      hash)
-        value=$(redis_exec_raw "$db" HGETALL "$key" 2>/dev/null | jq -Rs 'split("\n") | if length > 0 then [range(0; length; 2) as $i | {(.[($i)]): .[($i+1)]}] | add // {} else {} end' || echo "{}")
-        ;;
-      list)
-        value=$(redis_exec_raw "$db" LRANGE "$key" 0 -1 2>/dev/null | jq -Rs 'split("\n") | map(select(. != ""))' || echo "[]")
-        ;;
-      set)
-        value=$(redis_exec_raw "$db" SMEMBERS "$key" 2>/dev/null | jq -Rs 'split("\n") | map(select(. != ""))' || echo "[]")
-        ;;
-      zset)
-        value=$(redis_exec_raw "$db" ZRANGE "$key" 0 -1 WITHSCORES 2>/dev/null | jq -Rs 'split("\n") | map(select(. != "")) | [range(0; length; 2) as $i | {member: .[($i)], score: .[($i+1)]}]' || echo "[]")
-        ;;
-      *)
-        value="null"
-        ;;
-    esac
-
-    # Escape key for JSON
-    local escaped_key
-    escaped_key=$(echo "$key" | jq -Rs .)
+  for ((offset = 0; offset < ${#keys[@]}; offset += BACKUP_BATCH_SIZE)); do
+    local -a batch=("${keys[@]:offset:BACKUP_BATCH_SIZE}")
+    # redis-cli can exit 0 on an error reply, so the chunk must also parse as
+    # non-empty "key":{...} members before it is written; their count is what
+    # the trailer reports, not the number of keys requested
+    if ! chunk=$(redis_exec_raw "$db" EVAL "$BACKUP_SCRIPT" "${#batch[@]}" "${batch[@]}" 2>/dev/null); then
+      print_error "Failed to dump keys of $service (batch at offset $offset)" >&2
+      return 1
+    fi
+    if ! chunk_count=$(jq -e 'length | select(. > 0)' <<< "{$chunk}" 2>/dev/null); then
+      print_error "Invalid dump of $service keys (batch at offset $offset)" >&2
+      return 1
+    fi
 
     if [[ "$first" == true ]]; then
       first=false
     else
-      backup_data+=","
+      printf ','
     fi
 
-    backup_data+="$escaped_key:{\"type\":\"$key_type\",\"ttl\":$ttl,\"value\":$value}"
-
-  done <<< "$keys"
-
-  backup_data+="},"
-  backup_data+="\"key_count\":$key_count"
-  backup_data+="}"
+    printf '%s' "$chunk"
+    key_count=$((key_count + chunk_count))
+  done
 
-  echo "$backup_data"
+  printf '},"key_count":%s}\n' "$key_count"
 }
 
 # Main
@@ -169,6 +174,7 @@ echo ""
 print_info "Starting backup..."
 
 # Build complete backup JSON
+FAILED_SERVICE=""
 {
   echo "{"
   echo "\"backup_type\":\"redis\","
@@ -184,13 +190,23 @@ print_info "Starting backup..."
       echo ","
     fi
     echo "\"$svc\":"
-    backup_service "$svc"
+    if ! backup_service "$svc"; then
+      FAILED_SERVICE="$svc"
+      break
+    fi
   done
 
   echo "}"
   echo "}"
 } > "$BACKUP_FILE"
 
+# A partial dump is not a usable backup
+if [[ -n "$FAILED_SERVICE" ]]; then
+  rm -f "$BACKUP_FILE"
+  print_error "Backup failed for $FAILED_SERVICE; no backup file written"
+  exit 1
+fi
+
 # Validate JSON
 if ! jq . "$BACKUP_FILE" > /dev/null 2>&1; then
   print_warning "Backup file may have JSON formatting issues"
@@ -203,11 +219,10 @@ echo "File: $BACKUP_FILE"
 echo "Size: $(du -h "$BACKUP_FILE" | cut -f1)"
 echo ""
 
-for svc in "${SERVICES[@]}"; do
-  db="${SERVICE_DB_MAP[$svc]}"
-  count=$(jq -r ".services.\"$svc\".key_count // 0" "$BACKUP_FILE" 2>/dev/null || echo "?")
+# Read every service's key count in one jq pass
+while IFS=$'\t' read -r svc count; do
   printf "  %-20s %s keys\n" "$svc:" "$count"
-done
+done < <(jq -r '.services | to_entries[] | "\(.key)\t\(.value.key_count // 0)"' "$BACKUP_FILE" 2>/dev/null)
 
 echo ""
 print_success "Backup completed: $BACKUP_FILE"
@@ -25,7 +25,62 @@ show_usage() {
   list_services
 }
 
-# Restore a single key
+# Arguments per variadic write; even so hash/zset pairs are never split
+WRITE_BATCH_SIZE=1000
+
+# Run a write command, failing on a non-zero exit or an error reply
+# (redis-cli can exit 0 after printing an error). Only stdout is checked, so
+# warnings on stderr (auth, kubectl container defaulting) are ignored.
+redis_write() {
+  local db="$1"
+  shift
+  local reply
+
+  reply=$(redis_exec_raw "$db" "$@" 2>/dev/null) || return 1
+  [[ "$reply" == "OK" || "$reply" =~ ^[0-9]+$ ]]
+}
+
+# Decode a JSON string (as printed by jq's tojson) into the named variable.
+# Strings without escapes are unquoted in the shell; only the rest need jq.
+decode_json_string() {
+  local var="$1"
+  local json="$2"
+  local decoded
+
+  if [[ "$json" != *\\* ]]; then
+    decoded="${json:1:${#json}-2}"
+  else
+    # The trailing "." keeps command substitution from eating newlines
+    decoded=$(jq -j '. + "."' <<< "$json")
+    decoded="${decoded%.}"
+  fi
+
+  printf -v "$var" '%s' "$decoded"
+}
+
+# Keys deleted per UNLINK call
+DELETE_BATCH_SIZE=500
+
+# Delete the NUL-separated keys read from stdin, one UNLINK per batch
+delete_keys() {
+  local db="$1"
+  local -a keys=()
+  local offset
+
+  mapfile -d '' -t keys
+
+  for ((offset = 0; offset < ${#keys[@]}; offset += DELETE_BATCH_SIZE)); do
+    if ! redis_write "$db" UNLINK "${keys[@]:offset:DELETE_BATCH_SIZE}"; then
+      return 1
+    fi
+  done
+}
+
+# Restore a single key, replacing any existing value (collection keys are
+# cleared beforehand by restore_service; strings are replaced by SET)
+# Collections are written with variadic commands of up to WRITE_BATCH_SIZE
+# arguments (plus EXPIRE) so a restore costs a few round trips per key
+# instead of one per field/member.
 restore_key() {
   local db="$1"
   local key="$2"
@@ -39,41 +94,31 @@ restore_key() {
     return 0
   fi
 
+  # Collection arguments are read NUL-separated so fields and members may
+  # contain newlines
+  local -a args=()
+
   case "$key_type" in
     string)
       local str_value
       str_value=$(echo "$value" | jq -r '.')
-      redis_exec_raw "$db" SET "$key" "$str_value" > /dev/null
+      # SET ... EX applies the TTL in the same command
+      local -a ex_args=()
+      [[ "$ttl" -gt 0 ]] && ex_args=(EX "$ttl")
+      if ! redis_write "$db" SET "$key" "$str_value" "${ex_args[@]}"; then
+        print_error "Failed to write key '$key'"
+        return 1
+      fi
+      return 0
       ;;
     hash)
-      # Delete existing key first
-      redis_exec_raw "$db" DEL "$key" > /dev/null
-      # Set hash fields
-      echo "$value" | jq -r 'to_entries | .[] | "\(.key)\n\(.value)"' | while IFS= read -r field && IFS= read -r val; do
-        [[ -z "$field" ]] && continue
-        redis_exec_raw "$db" HSET "$key" "$field" "$val" > /dev/null
-      done
+      mapfile -d '' -t args < <(echo "$value" | jq -j 'to_entries | .[] | select(.key != "") | .key, (.value | tostring) | . + "\u0000"')
       ;;
-    list)
-      redis_exec_raw "$db" DEL "$key" > /dev/null
-      echo "$value" | jq -r '.[]' | while IFS= read -r item; do
-        [[ -z "$item" ]] && continue
-        redis_exec_raw "$db" RPUSH "$key" "$item" > /dev/null
-      done
-      ;;
-    set)
-      redis_exec_raw "$db" DEL "$key" > /dev/null
-      echo "$value" | jq -r '.[]' | while IFS= read -r item; do
-        [[ -z "$item" ]] && continue
-        redis_exec_raw "$db" SADD "$key" "$item" > /dev/null
-      done
+    list|set)
+      mapfile -d '' -t args < <(echo "$value" | jq -j '.[] | select(. != "") | tostring + "\u0000"')
       ;;
     zset)
-      redis_exec_raw "$db" DEL "$key" > /dev/null
-      echo "$value" | jq -r '.[] | "\(.score)\n\(.member)"' | while IFS= read -r score && IFS= read -r member; do
-        [[ -z "$member" ]] && continue
-        redis_exec_raw "$db" ZADD "$key" "$score" "$member" > /dev/null
-      done
+      mapfile -d '' -t args < <(echo "$value" | jq -j '.[] | select(.member != "") | (.score | tostring), .member | . + "\u0000"')
       ;;
     *)
       print_warning "Unknown type '$key_type' for key '$key', skipping"
@@ -81,9 +126,26 @@ restore_key() {
       ;;
   esac
 
+  local write_cmd
+  case "$key_type" in
+    hash) write_cmd=HSET ;;
+    list) write_cmd=RPUSH ;;
+    set) write_cmd=SADD ;;
+    zset) write_cmd=ZADD ;;
+  esac
+
+  local offset
+  for ((offset = 0; offset < ${#args[@]}; offset += WRITE_BATCH_SIZE)); do
+    if ! redis_write "$db" "$write_cmd" "$key" "${args[@]:offset:WRITE_BATCH_SIZE}"; then
+      print_error "Failed to write $key_type '$key'"
+      return 1
+    fi
+  done
+
   # Set TTL if specified
-  if [[ "$ttl" -gt 0 ]]; then
-    redis_exec_raw "$db" EXPIRE "$key" "$ttl" > /dev/null
+  if [[ "$ttl" -gt 0 ]] && ! redis_write "$db" EXPIRE "$key" "$ttl"; then
+    print_error "Failed to set TTL on key '$key'"
+    return 1
   fi
 
   return 0
@@ -121,17 +183,38 @@ restore_service() {
   local restored=0
   local failed=0
 
-  # Iterate over keys
-  while IFS= read -r key; do
-    [[ -z "$key" ]] && continue
+  # Clear existing collection keys in batches instead of one delete per key.
+  # Only hash/list/set/zset keys, which restore_key rewrites with batched
+  # writes, are deleted; strings are replaced by SET and keys of any other
+  # type are skipped, so they are left untouched.
+  # shellcheck disable=SC2016
+  local delete_filter='.services[$service].keys | to_entries[] | select(.value.type == ("hash", "list", "set", "zset")) | .key + "\u0000"'
 
-    local key_type
-    local ttl
-    local value
+  if [[ "$dry_run" != true ]]; then
+    if ! delete_keys "$db" < <(jq -j --arg service "$service" "$delete_filter" "$backup_file" 2>/dev/null); then
+      print_error "Failed to clear existing collection keys for $service"
+      return 1
+    fi
+  fi
 
-    key_type=$(jq -r ".services.\"$service\".keys.\"$key\".type // \"unknown\"" "$backup_file")
-    ttl=$(jq -r ".services.\"$service\".keys.\"$key\".ttl // -1" "$backup_file")
-    value=$(jq -c ".services.\"$service\".keys.\"$key\".value" "$backup_file")
+  local key
+  local key_type
+  local key_json
+  local type_json
+  local ttl
+  local value
+
+  # Iterate over keys; a single jq pass emits key, type, TTL and compact JSON
+  # value as four lines per key instead of re-parsing the file per field.
+  # Key and type are JSON-encoded so a newline in them cannot break framing
+  # ($service is a jq variable, not a shell one).
+  # shellcheck disable=SC2016
+  local filter='.services[$service].keys | to_entries[] | (.key | tojson), (.value.type // "unknown" | tostring | tojson), (.value.ttl // -1), (.value.value | tojson)'
+
+  while IFS= read -r key_json && IFS= read -r type_json && IFS= read -r ttl && IFS= read -r value; do
+    decode_json_string key "$key_json"
+    decode_json_string key_type "$type_json"
+    [[ -z "$key" ]] && continue
 
     if restore_key "$db" "$key" "$key_type" "$ttl" "$value" "$dry_run"; then
       ((restored++)) || true
@@ -139,7 +222,7 @@ restore_service() {
       ((failed++)) || true
     fi
 
-  done < <(jq -r ".services.\"$service\".keys | keys[]" "$backup_file" 2>/dev/null)
+  done < <(jq -r --arg service "$service" "$filter" "$backup_file" 2>/dev/null)
 
   echo "  Restored: $restored, Failed: $failed"
 }
@@ -259,7 +342,7 @@ if [[ "$FLUSH" == true ]] && [[ "$DRY_RUN" == false ]]; then
   print_warning "Flushing databases before restore..."
   for svc in "${SERVICES_TO_RESTORE[@]}"; do
     db="${SERVICE_DB_MAP[$svc]}"
-    redis_exec_raw "$db" FLUSHDB > /dev/null
+    redis_exec_raw "$db" FLUSHDB ASYNC > /dev/null
     echo "  Flushed DB $db ($svc)"
   done
 fi
@@ -0,0 +1,51 @@
+#!/bin/bash
+# Batched key metadata lookup shared by service-info.sh and service-monitor.sh
+# Sourced after ../lib/common.sh (uses get_db_keys and redis_exec_raw)
+
+# Keys inspected per EVAL call
+METADATA_BATCH_SIZE=500
+
+# Server-side TYPE, TTL and MEMORY USAGE lookup for a batch of keys, returned
+# as "key<TAB>type<TAB>ttl<TAB>bytes" lines so each batch is one round trip
+METADATA_SCRIPT='
+local out = {}
+for i, key in ipairs(KEYS) do
+  out[i] = table.concat({
+    key,
+    redis.call("TYPE", key)["ok"],
+    redis.call("TTL", key),
+    redis.call("MEMORY", "USAGE", key) or "?"
+  }, "\t")
+end
+return table.concat(out, "\n")
+'
+
+# A well-formed reply ends with the "<TAB>type<TAB>ttl<TAB>bytes" fields of
+# its last key; error text (which redis-cli may print with exit status 0)
+# never does
+METADATA_REPLY_PATTERN=$'\t[a-z]+\t-?[0-9]+\t([0-9]+|[?])$'
+
+# Print metadata lines for every key in a database
+# Returns 1 (with an error on stderr) at the first batch that fails, since the
+# caller would otherwise show partial counts as if they were complete.
+get_keys_metadata() {
+  local db="$1"
+  local -a keys=()
+  local offset
+  local reply
+
+  mapfile -t keys < <(get_db_keys "$db" 2>/dev/null | grep -v '^$' || true)
+
+  for ((offset = 0; offset < ${#keys[@]}; offset += METADATA_BATCH_SIZE)); do
+    local -a batch=("${keys[@]:offset:METADATA_BATCH_SIZE}")
+    if ! reply=$(redis_exec_raw "$db" EVAL "$METADATA_SCRIPT" "${#batch[@]}" "${batch[@]}" 2>/dev/null); then
+      print_error "Failed to read key metadata for DB $db (batch at offset $offset); results are incomplete" >&2
+      return 1
+    fi
+    if [[ ! "$reply" =~ $METADATA_REPLY_PATTERN ]]; then
+      print_error "Invalid key metadata for DB $db (batch at offset $offset); results are incomplete" >&2
+      return 1
+    fi
+    printf '%s\n' "$reply"
+  done
+}
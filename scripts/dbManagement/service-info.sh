@@ -7,6 +7,8 @@ set -euo pipefail
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 # shellcheck source=../lib/common.sh
 source "$SCRIPT_DIR/../lib/common.sh"
+# shellcheck source=key-metadata.sh
+source "$SCRIPT_DIR/key-metadata.sh"
 
 # Terminal width for formatting
 COLUMNS=$(tput cols 2>/dev/null || echo 80)
@@ -54,23 +56,21 @@ show_service_detailed() {
   echo ""
   echo "Keys:"
 
-  local keys
-  keys=$(get_db_keys "$db")
-
   local ttl_none=0
   local ttl_expiring=0
   local ttl_healthy=0
 
-  while IFS= read -r key; do
-    [[ -z "$key" ]] && continue
+  local key
+  local key_type
+  local ttl
+  local mem
 
-    local key_type
-    local ttl
-    local mem
+  while IFS=$'\t' read -r key key_type ttl mem; do
+    [[ -z "$key" ]] && continue
 
-    key_type=$(get_key_type "$db" "$key" 2>/dev/null || echo "unknown")
-    ttl=$(get_key_ttl "$db" "$key" 2>/dev/null || echo "-1")
-    mem=$(get_key_memory "$db" "$key" 2>/dev/null || echo "?")
+    key_type="${key_type:-unknown}"
+    ttl="${ttl:--1}"
+    mem="${mem:-?}"
 
     # Track TTL distribution
     if [[ "$ttl" == "-1" ]]; then
@@ -93,7 +93,7 @@ show_service_detailed() {
     fi
 
     printf "  %-50s %-10s %8s bytes  TTL: %s\n" "$key" "($key_type)" "$mem" "$ttl_display"
-  done <<< "$keys"
+  done < <(get_keys_metadata "$db")
 
   echo ""
   echo "TTL Summary:"
@@ -7,6 +7,8 @@ set -euo pipefail
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 # shellcheck source=../lib/common.sh
 source "$SCRIPT_DIR/../lib/common.sh"
+# shellcheck source=key-metadata.sh
+source "$SCRIPT_DIR/key-metadata.sh"
 
 COLUMNS=$(tput cols 2>/dev/null || echo 80)
 
@@ -21,37 +23,18 @@ show_usage() {
   list_services
 }
 
-# Get Redis server info
-get_server_info() {
-  local pod
-  local password
-  pod=$(get_master_pod)
-  password=$(get_redis_password)
-
-  kubectl exec -n "$NAMESPACE" "$pod" -- \
-    redis-cli -a "$password" --no-auth-warning INFO server 2>/dev/null
-}
-
-# Get Redis memory info
-get_memory_info() {
-  local pod
-  local password
-  pod=$(get_master_pod)
-  password=$(get_redis_password)
-
-  kubectl exec -n "$NAMESPACE" "$pod" -- \
-    redis-cli -a "$password" --no-auth-warning INFO memory 2>/dev/null
+# Get Redis info (default sections: server, clients, memory, keyspace, ...)
+get_info() {
+  kubectl exec -n "$NAMESPACE" "$MASTER_POD" -- \
+    redis-cli -a "$REDIS_PASSWORD" --no-auth-warning INFO 2>/dev/null
 }
 
-# Get Redis clients info
-get_clients_info() {
-  local pod
-  local password
-  pod=$(get_master_pod)
-  password=$(get_redis_password)
+# Extract a single field value from INFO output
+info_field() {
+  local info="$1"
+  local field="$2"
 
-  kubectl exec -n "$NAMESPACE" "$pod" -- \
-    redis-cli -a "$password" --no-auth-warning INFO clients 2>/dev/null
+  sed -n "s/^${field}:\([^[:space:]]*\).*/\1/p" <<< "$info"
 }
 
 # Show quick health for all services
@@ -61,24 +44,28 @@ show_all_health() {
   echo "Timestamp: $(date '+%Y-%m-%d %H:%M:%S')"
   echo ""
 
+  # One INFO round trip covers server, memory, clients and keyspace stats
+  local info
+  info=$(get_info || echo "")
+
   # Server info
   local uptime
   local version
-  uptime=$(get_server_info | grep -E "^uptime_in_days:" | cut -d: -f2 | tr -d '[:space:]')
-  version=$(get_server_info | grep -E "^redis_version:" | cut -d: -f2 | tr -d '[:space:]')
+  uptime=$(info_field "$info" uptime_in_days)
+  version=$(info_field "$info" redis_version)
   echo "Redis Version: ${version:-unknown}"
   echo "Uptime: ${uptime:-?} days"
 
   # Memory info
   local mem_used
   local mem_peak
-  mem_used=$(get_memory_info | grep -E "^used_memory_human:" | cut -d: -f2 | tr -d '[:space:]')
-  mem_peak=$(get_memory_info | grep -E "^used_memory_peak_human:" | cut -d: -f2 | tr -d '[:space:]')
+  mem_used=$(info_field "$info" used_memory_human)
+  mem_peak=$(info_field "$info" used_memory_peak_human)
   echo "Memory: ${mem_used:-?} (peak: ${mem_peak:-?})"
 
   # Clients info
   local clients
-  clients=$(get_clients_info | grep -E "^connected_clients:" | cut -d: -f2 | tr -d '[:space:]')
+  clients=$(info_field "$info" connected_clients)
   echo "Connected clients: ${clients:-?}"
 
   echo ""
@@ -87,8 +74,17 @@ show_all_health() {
 
   for svc in $(get_all_services | tr ' ' '\n' | sort); do
     local db="${SERVICE_DB_MAP[$svc]}"
-    local key_count
-    key_count=$(get_db_key_count "$db" 2>/dev/null || echo "?")
+    local key_count="?"
+
+    # Keyspace lines look like "db0:keys=12,expires=3,avg_ttl=0"; empty
+    # databases are omitted entirely
+    if [[ -n "$info" ]]; then
+      local keyspace
+      keyspace=$(info_field "$info" "db$db")
+      keyspace="${keyspace%%,*}"
+      key_count="${keyspace#keys=}"
+      key_count="${key_count:-0}"
+    fi
 
     local status="OK"
     if [[ "$key_count" == "?" ]]; then
@@ -123,10 +119,7 @@ show_service_monitor() {
     return
   fi
 
-  # Analyze keys
-  local keys
-  keys=$(get_db_keys "$db")
-
+  # Analyze keys (type, TTL and memory fetched in server-side batches)
   local total=0
   local ttl_none=0
   local ttl_expiring=0
@@ -136,18 +129,21 @@ show_service_monitor() {
   declare -A type_counts
   declare -A prefix_counts
 
-  while IFS= read -r key; do
+  local key
+  local key_type
+  local ttl
+  local mem
+
+  while IFS=$'\t' read -r key key_type ttl mem; do
     [[ -z "$key" ]] && continue
     ((total++)) || true
 
     # Type
-    local key_type
-    key_type=$(get_key_type "$db" "$key" 2>/dev/null || echo "unknown")
-    ((type_counts[$key_type]++)) || type_counts[$key_type]=1
+    key_type="${key_type:-unknown}"
+    type_counts[$key_type]=$((${type_counts[$key_type]:-0} + 1))
 
     # TTL
-    local ttl
-    ttl=$(get_key_ttl "$db" "$key" 2>/dev/null || echo "-1")
+    ttl="${ttl:--1}"
     if [[ "$ttl" == "-1" ]]; then
       ((ttl_none++)) || true
     elif [[ "$ttl" -lt 300 ]] && [[ "$ttl" -ge 0 ]]; then
@@ -157,18 +153,15 @@ show_service_monitor() {
     fi
 
     # Memory
-    local mem
-    mem=$(get_key_memory "$db" "$key" 2>/dev/null || echo "0")
     if [[ "$mem" =~ ^[0-9]+$ ]]; then
       ((total_mem += mem)) || true
     fi
 
-    # Key prefix (first segment before :)
-    local prefix
-    prefix=$(echo "$key" | cut -d: -f1)
-    ((prefix_counts[$prefix]++)) || prefix_counts[$prefix]=1
+    # Key prefix (first segment before :), via expansion rather than a subshell
+    local prefix="${key%%:*}"
+    prefix_counts[$prefix]=$((${prefix_counts[$prefix]:-0} + 1))
 
-  done <<< "$keys"
+  done < <(get_keys_metadata "$db")
 
   echo ""
   echo "Key Types:"
@@ -237,6 +230,13 @@ if [[ -z "$MASTER_POD" ]]; then
   exit 1
 fi
 
+# Resolve the password once; the INFO helpers reuse it with MASTER_POD
+REDIS_PASSWORD=$(get_redis_password)
+if [[ -z "$REDIS_PASSWORD" ]]; then
+  print_error "Could not retrieve Redis password from secret"
+  exit 1
+fi
+
 if [[ "$WATCH" == true ]]; then
   while true; do
     clear